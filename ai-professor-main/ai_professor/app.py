@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from urllib.parse import quote_plus
+
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from ai_professor.components.diagram import render_concept_diagram
 from ai_professor.components.layout import (
@@ -9,34 +14,33 @@ from ai_professor.components.layout import (
     render_sidebar,
     render_top_header,
 )
-from urllib.parse import quote_plus
-
-from ai_professor.services.gemini_service import GeminiServiceError, LearningContent, generate_learning_content
+from ai_professor.services.gemini_service import (
+    GeminiServiceError,
+    LearningContent,
+    extract_partial_explanation,
+    generate_learning_content,
+)
 from ai_professor.services.youtube_service import YouTubeServiceError, search_youtube_video
+from ai_professor.utils.env import get_api_key, load_local_env
+from ai_professor.utils.formatting import render_bullets
 
 
-st.set_page_config(page_title="AI Professor", page_icon="\U0001F393", layout="wide")
+# Module import happens once per process, so .env is read once rather than per rerun.
+load_local_env()
 
 
 def _init_state() -> None:
     if "topic_history" not in st.session_state:
-        st.session_state.topic_history = []
+        st.session_state.topic_history = deque(maxlen=50)
+        st.session_state.topic_history_set = set()
     if "last_result" not in st.session_state:
         st.session_state.last_result = None
     if "last_video" not in st.session_state:
         st.session_state.last_video = None
 
 
-def _render_bullets(items: list[str], empty_text: str = "No items available.") -> None:
-    if not items:
-        st.write(empty_text)
-        return
-    for item in items:
-        st.markdown(f"- {item}")
-
-
 def _is_demo_mode() -> bool:
-    value = st.secrets["DEMO_MODE"] if "DEMO_MODE" in st.secrets else "false"
+    value = get_api_key("DEMO_MODE") or "false"
     return str(value).strip().lower() in {"1", "true", "yes", "on"}
 
 
@@ -77,41 +81,50 @@ def _demo_content(topic: str, mode: str) -> LearningContent:
     )
 
 
-def _generate(topic: str, mode: str, youtube_api_key: str | None, demo_mode: bool) -> None:
+def _generate(topic: str, mode: str, youtube_enabled: bool, demo_mode: bool) -> None:
     if not topic:
         st.error("Please enter a topic before generating content.")
         return
 
-    if demo_mode:
-        content = _demo_content(topic=topic, mode=mode)
-    else:
-        with st.spinner("Professor is thinking..."):
-            try:
-                content = generate_learning_content(topic=topic, mode=mode)
-            except GeminiServiceError as exc:
-                st.error(str(exc))
-                if "quota" in str(exc).lower() or "resourceexhausted" in str(exc).lower() or "429" in str(exc):
-                    st.info("This is a Gemini project/key quota limit. Use a different API key, wait for quota reset, or enable billing in Google AI Studio/Cloud.")
-                return
-            except Exception as exc:
-                st.error(f"Unexpected error while generating content: {exc}")
-                return
-
     video: dict | None = None
-    if youtube_api_key:
-        with st.spinner("Professor is finding a lesson video..."):
-            try:
-                video = search_youtube_video(topic=topic, youtube_api_key=youtube_api_key)
-            except YouTubeServiceError as exc:
-                st.warning(str(exc))
-            except Exception:
-                st.warning("Unable to fetch YouTube video right now.")
-    else:
-        search_query = quote_plus(f"{topic} tutorial")
-        video = {
-            "title": f"{topic} tutorial (YouTube search)",
-            "search_url": f"https://www.youtube.com/results?search_query={search_query}",
-        }
+    # Gemini and YouTube are independent network calls, so run them side by side.
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=2, initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+        streamed: list[str] = []
+        content_future = (
+            None
+            if demo_mode
+            else executor.submit(generate_learning_content, topic=topic, mode=mode, _on_chunk=streamed.append)
+        )
+        video_future = (
+            executor.submit(search_youtube_video, topic=topic)
+            if youtube_enabled
+            else None
+        )
+
+        with st.spinner("Professor is preparing your lesson..."):
+            if content_future is None:
+                content = _demo_content(topic=topic, mode=mode)
+            else:
+                _preview_explanation(content_future, streamed)
+                try:
+                    content = content_future.result()
+                except GeminiServiceError as exc:
+                    st.error(str(exc))
+                    if "quota" in str(exc).lower() or "resourceexhausted" in str(exc).lower() or "429" in str(exc):
+                        st.info("This is a Gemini project/key quota limit. Use a different API key, wait for quota reset, or enable billing in Google AI Studio/Cloud.")
+                    return
+                except Exception as exc:
+                    st.error(f"Unexpected error while generating content: {exc}")
+                    return
+
+            if video_future is not None:
+                try:
+                    video = video_future.result()
+                except YouTubeServiceError as exc:
+                    st.warning(str(exc))
+                except Exception:
+                    st.warning("Unable to fetch YouTube video right now.")
 
     if video is None:
         search_query = quote_plus(f"{topic} tutorial")
@@ -122,84 +135,135 @@ def _generate(topic: str, mode: str, youtube_api_key: str | None, demo_mode: boo
 
     st.session_state.last_result = content
     st.session_state.last_video = video
-    if topic not in st.session_state.topic_history:
-        st.session_state.topic_history.append(topic)
+    _remember_topic(topic)
+
 
+def _preview_explanation(future: Future, streamed: list[str]) -> None:
+    # Show the explanation as it streams in; cache hits finish before the first poll.
+    preview = st.empty()
+    shown = ""
+    while not wait([future], timeout=0.2).done:
+        partial = extract_partial_explanation("".join(streamed))
+        if partial != shown:
+            preview.markdown(partial)
+            shown = partial
+    preview.empty()
 
+
+def _remember_topic(topic: str) -> None:
+    history: deque[str] = st.session_state.topic_history
+    seen: set[str] = st.session_state.topic_history_set
+    if topic in seen:
+        return
+    if len(history) == history.maxlen:
+        seen.discard(history[0])
+    history.append(topic)
+    seen.add(topic)
+
+
+_RESULT_TABS = (
+    "\U0001F4D8 Explanation",
+    "\U0001F3A5 Video",
+    "\U0001F4CA Diagram",
+    "\U0001F6E3 Roadmap",
+    "\U0001F4A1 Projects & Interview",
+)
+
+
+def _render_explanation_tab(content: LearningContent) -> None:
+    with st.container(border=True):
+        st.subheader("SECTION 1: Simple Explanation")
+        st.write(content.simple_explanation)
+
+    with st.container(border=True):
+        st.subheader("SECTION 2: Key Concepts")
+        render_bullets(content.key_concepts)
+
+    with st.container(border=True):
+        st.subheader("SECTION 3: Real-world Applications")
+        render_bullets(content.real_world_applications)
+
+
+def _render_video_tab(video: dict | None) -> None:
+    with st.container(border=True):
+        st.subheader("Video Lesson")
+        if video and video.get("url"):
+            st.video(video["url"])
+            if video.get("title"):
+                st.caption(video["title"])
+        elif video and video.get("search_url"):
+            st.link_button("Open YouTube results", video["search_url"], use_container_width=True)
+            if video.get("title"):
+                st.caption(video["title"])
+        else:
+            st.info("No video found for this topic.")
+
+
+def _render_diagram_tab(topic: str, content: LearningContent) -> None:
+    with st.container(border=True):
+        st.subheader("SECTION 4: Diagram")
+        render_concept_diagram(topic, content.key_concepts, content.real_world_applications)
+
+
+def _render_roadmap_tab(content: LearningContent) -> None:
+    with st.container(border=True):
+        st.subheader("SECTION 5: Prerequisites")
+        render_bullets(content.prerequisites)
+
+    with st.container(border=True):
+        st.subheader("SECTION 6: What To Learn Next")
+        render_bullets(content.what_to_learn_next)
+
+    with st.container(border=True):
+        st.subheader("SECTION 7: Roadmap (Beginner -> Intermediate -> Advanced)")
+        c1, c2, c3 = st.columns(3)
+        with c1:
+            st.markdown("**Beginner**")
+            render_bullets(content.roadmap.get("Beginner", []))
+        with c2:
+            st.markdown("**Intermediate**")
+            render_bullets(content.roadmap.get("Intermediate", []))
+        with c3:
+            st.markdown("**Advanced**")
+            render_bullets(content.roadmap.get("Advanced", []))
+
+
+def _render_projects_tab(content: LearningContent) -> None:
+    with st.container(border=True):
+        st.subheader("SECTION 8: Suggested Projects")
+        render_bullets(content.suggested_projects)
+
+    with st.container(border=True):
+        st.subheader("SECTION 9: Interview Questions")
+        render_bullets(content.interview_questions)
+
+
+@st.fragment
 def _render_results(topic: str, content: LearningContent, video: dict | None) -> None:
-    tabs = st.tabs([
-        "\U0001F4D8 Explanation",
-        "\U0001F3A5 Video",
-        "\U0001F4CA Diagram",
-        "\U0001F6E3 Roadmap",
-        "\U0001F4A1 Projects & Interview",
-    ])
-
-    with tabs[0]:
-        with st.container(border=True):
-            st.subheader("SECTION 1: Simple Explanation")
-            st.write(content.simple_explanation)
-
-        with st.container(border=True):
-            st.subheader("SECTION 2: Key Concepts")
-            _render_bullets(content.key_concepts)
-
-        with st.container(border=True):
-            st.subheader("SECTION 3: Real-world Applications")
-            _render_bullets(content.real_world_applications)
-
-    with tabs[1]:
-        with st.container(border=True):
-            st.subheader("Video Lesson")
-            if video and video.get("url"):
-                st.video(video["url"])
-                if video.get("title"):
-                    st.caption(video["title"])
-            elif video and video.get("search_url"):
-                st.link_button("Open YouTube results", video["search_url"], use_container_width=True)
-                if video.get("title"):
-                    st.caption(video["title"])
-            else:
-                st.info("No video found for this topic.")
-
-    with tabs[2]:
-        with st.container(border=True):
-            st.subheader("SECTION 4: Diagram")
-            render_concept_diagram(topic, content.key_concepts, content.real_world_applications)
-
-    with tabs[3]:
-        with st.container(border=True):
-            st.subheader("SECTION 5: Prerequisites")
-            _render_bullets(content.prerequisites)
-
-        with st.container(border=True):
-            st.subheader("SECTION 6: What To Learn Next")
-            _render_bullets(content.what_to_learn_next)
-
-        with st.container(border=True):
-            st.subheader("SECTION 7: Roadmap (Beginner -> Intermediate -> Advanced)")
-            c1, c2, c3 = st.columns(3)
-            with c1:
-                st.markdown("**Beginner**")
-                _render_bullets(content.roadmap.get("Beginner", []))
-            with c2:
-                st.markdown("**Intermediate**")
-                _render_bullets(content.roadmap.get("Intermediate", []))
-            with c3:
-                st.markdown("**Advanced**")
-                _render_bullets(content.roadmap.get("Advanced", []))
-
-    with tabs[4]:
-        with st.container(border=True):
-            st.subheader("SECTION 8: Suggested Projects")
-            _render_bullets(content.suggested_projects)
-
-        with st.container(border=True):
-            st.subheader("SECTION 9: Interview Questions")
-            _render_bullets(content.interview_questions)
+    # st.tabs executes every tab body on each rerun, so only the selected section is
+    # rendered here; switching sections reruns just this fragment.
+    active = st.segmented_control(
+        "Section",
+        _RESULT_TABS,
+        default=_RESULT_TABS[0],
+        key="active_tab",
+        label_visibility="collapsed",
+    ) or _RESULT_TABS[0]
+
+    if active == _RESULT_TABS[0]:
+        _render_explanation_tab(content)
+    elif active == _RESULT_TABS[1]:
+        _render_video_tab(video)
+    elif active == _RESULT_TABS[2]:
+        _render_diagram_tab(topic, content)
+    elif active == _RESULT_TABS[3]:
+        _render_roadmap_tab(content)
+    else:
+        _render_projects_tab(content)
 
 
 def main() -> None:
+    st.set_page_config(page_title="AI Professor", page_icon="\U0001F393", layout="wide")
     _init_state()
     apply_classroom_styles()
 
@@ -207,13 +271,13 @@ def main() -> None:
     render_top_header()
     demo_mode = _is_demo_mode()
 
-    if not demo_mode and "GEMINI_API_KEY" not in st.secrets:
+    if not demo_mode and not get_api_key("GEMINI_API_KEY"):
         st.error("GEMINI_API_KEY missing. Add it to Streamlit Secrets.")
         st.stop()
     if demo_mode:
         st.info("Demo mode is ON. Using local sample content without Gemini API calls.")
 
-    youtube_api_key = st.secrets["YOUTUBE_API_KEY"] if "YOUTUBE_API_KEY" in st.secrets else None
+    youtube_enabled = get_api_key("YOUTUBE_API_KEY") is not None
 
     _, center, _ = st.columns([1, 5, 1])
     with center:
@@ -221,7 +285,7 @@ def main() -> None:
         generate_clicked = st.button("Generate Classroom Session", type="primary", use_container_width=True)
 
     if generate_clicked:
-        _generate(topic=topic.strip(), mode=mode, youtube_api_key=youtube_api_key, demo_mode=demo_mode)
+        _generate(topic=topic.strip(), mode=mode, youtube_enabled=youtube_enabled, demo_mode=demo_mode)
 
     if st.session_state.last_result:
         current_topic = topic.strip() if topic.strip() else st.session_state.topic_history[-1]
@@ -1,37 +1,44 @@
 from __future__ import annotations
 
-from graphviz import Digraph
 import streamlit as st
 
 
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _build_dot(topic: str, key_concepts: tuple[str, ...], applications: tuple[str, ...]) -> str:
+    from graphviz import Digraph
+
+    graph = Digraph()
+    graph.attr(rankdir="LR")
+
+    topic_id = "topic"
+    graph.node(topic_id, topic)
+
+    concept_nodes: list[str] = []
+    for index, concept in enumerate(key_concepts):
+        node_id = f"concept_{index}"
+        graph.node(node_id, concept)
+        graph.edge(topic_id, node_id)
+        concept_nodes.append(node_id)
+
+    for index, app in enumerate(applications):
+        app_id = f"app_{index}"
+        graph.node(app_id, app)
+        if concept_nodes:
+            graph.edge(concept_nodes[index % len(concept_nodes)], app_id)
+        else:
+            graph.edge(topic_id, app_id)
+
+    return graph.source
+
+
 def render_concept_diagram(topic: str, key_concepts: list[str], applications: list[str]) -> None:
     try:
-        graph = Digraph()
-        graph.attr(rankdir="LR")
-
-        topic_id = "topic"
-        graph.node(topic_id, topic)
-
-        concept_nodes: list[str] = []
-        for index, concept in enumerate(key_concepts[:8]):
-            node_id = f"concept_{index}"
-            graph.node(node_id, concept)
-            graph.edge(topic_id, node_id)
-            concept_nodes.append(node_id)
-
-        for index, app in enumerate(applications[:6]):
-            app_id = f"app_{index}"
-            graph.node(app_id, app)
-            if concept_nodes:
-                graph.edge(concept_nodes[index % len(concept_nodes)], app_id)
-            else:
-                graph.edge(topic_id, app_id)
-
-        st.graphviz_chart(graph, use_container_width=True)
+        dot_source = _build_dot(topic, tuple(key_concepts[:8]), tuple(applications[:6]))
+        # Layout happens client-side; the server only ships the DOT source.
+        st.graphviz_chart(dot_source, use_container_width=True)
     except Exception:
         st.warning("Diagram rendering failed. Showing structured fallback.")
-        st.markdown(f"- **Topic:** {topic}")
-        for concept in key_concepts:
-            st.markdown(f"  - **Concept:** {concept}")
-        for app in applications:
-            st.markdown(f"  - **Application:** {app}")
\ No newline at end of file
+        lines = [f"- **Topic:** {topic}"]
+        lines.extend(f"  - **Concept:** {concept}" for concept in key_concepts)
+        lines.extend(f"  - **Application:** {app}" for app in applications)
+        st.markdown("\n".join(lines))
@@ -1,12 +1,69 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
-from dataclasses import dataclass
-from typing import Any
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable
 
 import streamlit as st
 
+from ai_professor.utils.env import get_api_key
+
+try:
+    from orjson import loads as _json_loads
+except Exception:
+    _json_loads = json.loads
+
+# Anchored to the app directory (ai-professor-main/) rather than the launch directory.
+_DISK_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "gemini"
+_DISK_CACHE_MAX_AGE = 24 * 60 * 60
+_DISK_CACHE_MAX_ENTRIES = 256
+
+_JSON_DECODER = json.JSONDecoder()
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.MULTILINE)
+_PARTIAL_EXPLANATION_RE = re.compile(r'"simple_explanation"\s*:\s*"((?:[^"\\]|\\.)*)')
+_TRAILING_UNICODE_ESCAPE_RE = re.compile(
+    r"(?:\\u[dD][89abAB][0-9a-fA-F]{2})?\\u[0-9a-fA-F]{0,3}$|\\u[dD][89abAB][0-9a-fA-F]{2}$"
+)
+_LONE_SURROGATE_RE = re.compile("[\ud800-\udfff]")
+
+_SCHEMA = {
+    "simple_explanation": "string",
+    "key_concepts": ["string"],
+    "real_world_applications": ["string"],
+    "prerequisites": ["string"],
+    "what_to_learn_next": ["string"],
+    "roadmap": {
+        "Beginner": ["string"],
+        "Intermediate": ["string"],
+        "Advanced": ["string"],
+    },
+    "suggested_projects": ["string"],
+    "interview_questions": ["string"],
+}
+_SCHEMA_JSON = json.dumps(_SCHEMA)
+_LIST_FIELDS = tuple(field for field, shape in _SCHEMA.items() if isinstance(shape, list))
+_ROADMAP_LEVELS = frozenset(_SCHEMA["roadmap"])
+
+_PROMPT_TEMPLATE = """
+You are AI Professor, a friendly virtual teacher.
+Topic: {topic}
+Learning mode: {mode}
+
+Return JSON only and match exactly this schema:
+{schema}
+
+Rules:
+- Keep tone teacher-like, clear, and simple.
+- Be topic-specific and practical.
+- No markdown fences.
+- No extra keys.
+""".strip()
+
 
 class GeminiServiceError(RuntimeError):
     """Raised when Gemini generation fails."""
@@ -24,51 +81,37 @@ class LearningContent:
     interview_questions: list[str]
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def generate_learning_content(topic: str, mode: str) -> LearningContent:
+@st.cache_resource(show_spinner=False)
+def _get_model(api_key: str, model_name: str) -> Any:
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
+
+
+@st.cache_data(ttl=3600, max_entries=64, show_spinner=False)
+def generate_learning_content(
+    topic: str,
+    mode: str,
+    _on_chunk: Callable[[str], None] | None = None,
+) -> LearningContent:
+    """Generate the learning pack; on a cache miss, raw response text is streamed to _on_chunk."""
+    model_name = get_api_key("GEMINI_MODEL") or "gemini-1.5-flash"
+    cached = _read_disk_cache(model_name, topic, mode)
+    if cached is not None:
+        return cached
+
+    api_key = get_api_key("GEMINI_API_KEY")
+    if not api_key:
+        raise GeminiServiceError("GEMINI_API_KEY missing. Add it to Streamlit Secrets.")
     try:
-        import google.generativeai as genai
-        import streamlit as st
-
-        genai.configure(api_key=st.secrets["GEMINI_API_KEY"])
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        if "GEMINI_MODEL" in st.secrets and str(st.secrets["GEMINI_MODEL"]).strip():
-            model = genai.GenerativeModel(str(st.secrets["GEMINI_MODEL"]).strip())
-    except KeyError as exc:
-        raise GeminiServiceError("GEMINI_API_KEY missing. Add it to Streamlit Secrets.") from exc
+        model = _get_model(api_key, model_name)
     except Exception as exc:
         raise GeminiServiceError(f"Gemini initialization failed: {exc}") from exc
 
-    schema = {
-        "simple_explanation": "string",
-        "key_concepts": ["string"],
-        "real_world_applications": ["string"],
-        "prerequisites": ["string"],
-        "what_to_learn_next": ["string"],
-        "roadmap": {
-            "Beginner": ["string"],
-            "Intermediate": ["string"],
-            "Advanced": ["string"],
-        },
-        "suggested_projects": ["string"],
-        "interview_questions": ["string"],
-    }
-
-    prompt = f"""
-You are AI Professor, a friendly virtual teacher.
-Topic: {topic}
-Learning mode: {mode}
-
-Return JSON only and match exactly this schema:
-{json.dumps(schema)}
-
-Rules:
-- Keep tone teacher-like, clear, and simple.
-- Be topic-specific and practical.
-- No markdown fences.
-- No extra keys.
-""".strip()
+    prompt = _PROMPT_TEMPLATE.format(topic=topic, mode=mode, schema=_SCHEMA_JSON)
 
+    chunks: list[str] = []
     try:
         response = model.generate_content(
             prompt,
@@ -76,50 +119,218 @@ Rules:
                 "temperature": 0.35,
                 "response_mime_type": "application/json",
             },
+            stream=True,
         )
+        for chunk in response:
+            text = _chunk_text(chunk)
+            if not text:
+                continue
+            chunks.append(text)
+            if _on_chunk is not None:
+                _on_chunk(text)
     except Exception as exc:
         # Surface the raw provider error so deployment/debug issues are visible in Streamlit UI.
         raise GeminiServiceError(f"{type(exc).__name__}: {exc}") from exc
 
-    payload = _safe_json_parse(getattr(response, "text", ""))
+    if not chunks:
+        raise GeminiServiceError(f"Gemini returned no content: {_finish_details(response)}")
+
+    payload = _safe_json_parse("".join(chunks))
+    if not any(field in payload for field in _LIST_FIELDS):
+        # Schema keys were renamed or translated; recover sections from value shapes instead.
+        content = _content_from_shapes(payload)
+    else:
+        content = LearningContent(
+            simple_explanation=str(payload.get("simple_explanation", "Explanation unavailable.")),
+            key_concepts=_normalize_list(payload.get("key_concepts")),
+            real_world_applications=_normalize_list(payload.get("real_world_applications")),
+            prerequisites=_normalize_list(payload.get("prerequisites")),
+            what_to_learn_next=_normalize_list(payload.get("what_to_learn_next")),
+            roadmap=_normalize_roadmap(payload.get("roadmap")),
+            suggested_projects=_normalize_list(payload.get("suggested_projects")),
+            interview_questions=_normalize_list(payload.get("interview_questions")),
+        )
+
+    _write_disk_cache(model_name, topic, mode, content)
+    return content
+
+
+def _chunk_text(chunk: Any) -> str:
+    # chunk.text raises ValueError for part-less chunks (e.g. a trailing metadata-only
+    # chunk), so read the parts of the single candidate directly.
+    candidates = getattr(chunk, "candidates", None) or []
+    if not candidates:
+        return ""
+    parts = getattr(candidates[0].content, "parts", None) or []
+    return "".join(getattr(part, "text", "") for part in parts)
+
+
+def _finish_details(response: Any) -> str:
+    feedback = getattr(response, "prompt_feedback", None)
+    if feedback is not None and getattr(feedback, "block_reason", None):
+        return f"prompt blocked ({feedback.block_reason})."
+    candidates = getattr(response, "candidates", None) or []
+    if candidates:
+        reason = candidates[0].finish_reason
+        return f"finish reason {getattr(reason, 'name', reason)}."
+    return "empty response."
+
+
+def _disk_cache_path(model_name: str, topic: str, mode: str) -> Path:
+    # The model is part of the key so switching GEMINI_MODEL never serves the old model's packs.
+    key = hashlib.blake2b(f"{model_name}|{topic}|{mode}".encode(), digest_size=16).hexdigest()
+    return _DISK_CACHE_DIR / f"{key}.json"
+
+
+def _read_disk_cache(model_name: str, topic: str, mode: str) -> LearningContent | None:
+    """Return a stored pack younger than _DISK_CACHE_MAX_AGE; stale or unreadable entries are misses."""
+    path = _disk_cache_path(model_name, topic, mode)
+    try:
+        if time.time() - path.stat().st_mtime > _DISK_CACHE_MAX_AGE:
+            path.unlink(missing_ok=True)
+            return None
+        return LearningContent(**json.loads(path.read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_disk_cache(model_name: str, topic: str, mode: str, content: LearningContent) -> None:
+    # The disk layer is best-effort: a read-only or full filesystem must not fail generation.
+    try:
+        _DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _disk_cache_path(model_name, topic, mode)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(asdict(content)), encoding="utf-8")
+        os.replace(tmp_path, path)
+        _prune_disk_cache()
+    except OSError:
+        pass
+
+
+def _prune_disk_cache() -> None:
+    """Drop expired entries, then the oldest ones beyond _DISK_CACHE_MAX_ENTRIES."""
+    cutoff = time.time() - _DISK_CACHE_MAX_AGE
+    entries: list[tuple[float, Path]] = []
+    for path in _DISK_CACHE_DIR.glob("*.json"):
+        try:
+            mtime = path.stat().st_mtime
+            if mtime < cutoff:
+                path.unlink(missing_ok=True)
+            else:
+                entries.append((mtime, path))
+        except OSError:
+            continue
+
+    entries.sort()
+    for _, path in entries[: max(0, len(entries) - _DISK_CACHE_MAX_ENTRIES)]:
+        path.unlink(missing_ok=True)
+
+
+def _content_from_shapes(payload: dict[str, Any]) -> LearningContent:
+    """Map payload values onto LearningContent by type, in schema order."""
+    explanation = ""
+    roadmap: Any = None
+    lists: list[list[str]] = []
+    for value in payload.values():
+        if isinstance(value, str):
+            explanation = explanation or value.strip()
+        elif isinstance(value, dict) and _ROADMAP_LEVELS <= value.keys():
+            roadmap = value
+        elif isinstance(value, list) and all(isinstance(item, str) for item in value):
+            lists.append(_normalize_list(value))
 
+    lists.extend([] for _ in range(len(_LIST_FIELDS) - len(lists)))
     return LearningContent(
-        simple_explanation=str(payload.get("simple_explanation", "Explanation unavailable.")),
-        key_concepts=_normalize_list(payload.get("key_concepts")),
-        real_world_applications=_normalize_list(payload.get("real_world_applications")),
-        prerequisites=_normalize_list(payload.get("prerequisites")),
-        what_to_learn_next=_normalize_list(payload.get("what_to_learn_next")),
-        roadmap=_normalize_roadmap(payload.get("roadmap")),
-        suggested_projects=_normalize_list(payload.get("suggested_projects")),
-        interview_questions=_normalize_list(payload.get("interview_questions")),
+        simple_explanation=explanation or "Explanation unavailable.",
+        roadmap=_normalize_roadmap(roadmap),
+        **dict(zip(_LIST_FIELDS, lists)),
     )
 
 
+def extract_partial_explanation(text: str) -> str:
+    """Return the part of simple_explanation received so far in a streamed response."""
+    match = _PARTIAL_EXPLANATION_RE.search(text)
+    if match is None:
+        return ""
+    # A chunk boundary can split a \uXXXX escape or a surrogate pair; hold the unfinished
+    # tail back until the rest arrives. Any surrogate left after decoding is unpaired and
+    # cannot be UTF-8 encoded for the frontend, so it is dropped.
+    raw = _TRAILING_UNICODE_ESCAPE_RE.sub("", match.group(1))
+    try:
+        decoded = json.loads(f'"{raw}"', strict=False)
+    except ValueError:
+        decoded = raw
+    return _LONE_SURROGATE_RE.sub("", decoded)
+
+
 def _safe_json_parse(text: str) -> dict[str, Any]:
-    cleaned = re.sub(r"^```(?:json)?|```$", "", (text or "").strip(), flags=re.MULTILINE).strip()
+    cleaned = (text or "").strip()
+    if "```" in cleaned:
+        cleaned = _FENCE_RE.sub("", cleaned).strip()
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        start = cleaned.find("{")
-        end = cleaned.rfind("}")
-        if start != -1 and end != -1 and end > start:
-            return json.loads(cleaned[start : end + 1])
-        raise GeminiServiceError("Gemini returned invalid JSON.")
+        payload = _json_loads(cleaned)
+    except ValueError:
+        pass
+    else:
+        # JSON mode sometimes wraps the object in a one-element array.
+        if isinstance(payload, list) and len(payload) == 1:
+            payload = payload[0]
+        if not isinstance(payload, dict):
+            raise GeminiServiceError("Gemini returned JSON that is not an object.")
+        return payload
+
+    # Decode the first object in place; prose before or after it is ignored. Brace groups
+    # that are not valid JSON are skipped whole, never descended into.
+    start = cleaned.find("{")
+    while start != -1:
+        try:
+            payload, _ = _JSON_DECODER.raw_decode(cleaned, start)
+            return payload
+        except ValueError:
+            end = _balanced_object_end(cleaned, start)
+            if end == -1:
+                break
+            start = cleaned.find("{", end)
+    raise GeminiServiceError("Gemini returned invalid JSON.")
+
+
+def _balanced_object_end(text: str, start: int) -> int:
+    """Return the index just past the {...} group opening at start, or -1 if it never closes."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return -1
 
 
 def _normalize_list(value: Any) -> list[str]:
     if isinstance(value, list):
-        return [str(item).strip() for item in value if str(item).strip()]
-    if isinstance(value, str) and value.strip():
-        return [value.strip()]
+        items = (item.strip() if isinstance(item, str) else str(item).strip() for item in value)
+        return [text for text in items if text]
+    if isinstance(value, str):
+        text = value.strip()
+        return [text] if text else []
     return []
 
 
 def _normalize_roadmap(value: Any) -> dict[str, list[str]]:
-    roadmap = {"Beginner": [], "Intermediate": [], "Advanced": []}
+    levels = tuple(_SCHEMA["roadmap"])
     if not isinstance(value, dict):
-        return roadmap
-
-    for level in roadmap:
-        roadmap[level] = _normalize_list(value.get(level))
-    return roadmap
+        return {level: [] for level in levels}
+    return {level: _normalize_list(value.get(level)) for level in levels}
@@ -4,14 +4,36 @@ from typing import Any
 
 import requests
 import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from ai_professor.utils.env import get_api_key
+
+_REASON_MESSAGES = {
+    "quotaexceeded": "YouTube API quota exceeded. Please try later.",
+    "dailylimitexceeded": "YouTube API quota exceeded. Please try later.",
+    "keyinvalid": "Invalid YouTube API key.",
+}
 
 
 class YouTubeServiceError(RuntimeError):
     """Raised when YouTube API search fails."""
 
 
-@st.cache_data(ttl=3600, show_spinner=False)
-def search_youtube_video(topic: str, youtube_api_key: str) -> dict[str, Any] | None:
+@st.cache_resource(show_spinner=False)
+def _get_session() -> requests.Session:
+    # Shared across reruns and sessions so keep-alive reuses the TLS connection. Only
+    # connection failures are retried; read=False re-raises read timeouts untouched so
+    # they still surface as requests' Timeout rather than a wrapped ConnectionError.
+    retries = Retry(total=2, connect=2, read=False, backoff_factor=0.3)
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retries))
+    return session
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def search_youtube_video(topic: str) -> dict[str, Any] | None:
+    youtube_api_key = get_api_key("YOUTUBE_API_KEY")
     if not youtube_api_key:
         return None
 
@@ -20,11 +42,12 @@ def search_youtube_video(topic: str, youtube_api_key: str) -> dict[str, Any] | N
         "q": f"{topic} tutorial",
         "type": "video",
         "maxResults": 1,
+        "fields": "items(id/videoId,snippet/title)",
         "key": youtube_api_key,
     }
 
     try:
-        response = requests.get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=20)
+        response = _get_session().get("https://www.googleapis.com/youtube/v3/search", params=params, timeout=5)
         data = response.json()
     except requests.exceptions.Timeout as exc:
         raise YouTubeServiceError("YouTube request timed out.") from exc
@@ -41,12 +64,15 @@ def search_youtube_video(topic: str, youtube_api_key: str) -> dict[str, Any] | N
         if errors:
             reason = errors[0].get("reason", "")
 
-        normalized = (reason or message).lower()
-        if "quota" in normalized:
-            raise YouTubeServiceError("YouTube API quota exceeded. Please try later.")
-        if "keyinvalid" in normalized or "api key" in normalized:
-            raise YouTubeServiceError("Invalid YouTube API key.")
-        raise YouTubeServiceError(f"YouTube API error: {reason or message}")
+        friendly = _REASON_MESSAGES.get((reason or "").lower())
+        if friendly is None:
+            lowered = (message or "").lower()
+            if "quota" in lowered:
+                friendly = _REASON_MESSAGES["quotaexceeded"]
+            elif "api key" in lowered:
+                # Bad keys come back as reason "badRequest" with an "API key not valid" message.
+                friendly = _REASON_MESSAGES["keyinvalid"]
+        raise YouTubeServiceError(friendly or f"YouTube API error: {reason or message}")
 
     items = data.get("items", [])
     if not items:
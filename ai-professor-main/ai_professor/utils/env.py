@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+from functools import lru_cache
 
 import streamlit as st
 
@@ -16,21 +17,25 @@ def load_local_env() -> None:
         load_dotenv()
 
 
+@lru_cache(maxsize=16)
 def get_api_key(key_name: str) -> str | None:
-    """Read key from Streamlit secrets first, then fallback to local environment."""
+    """Read key from Streamlit secrets first, then fallback to local environment.
+
+    Results (including misses) are memoized for the process lifetime, so restart the
+    app after rotating a key.
+    """
     try:
-        if key_name in st.secrets:
-            value = st.secrets[key_name]
-            if isinstance(value, str) and value.strip():
-                return value.strip()
+        value = _clean(st.secrets.get(key_name))
     except Exception:
-        pass
+        value = None
+    return value or _clean(os.getenv(key_name))
 
-    env_value = os.getenv(key_name)
-    if isinstance(env_value, str) and env_value.strip():
-        return env_value.strip()
 
-    return None
+def _clean(value: object) -> str | None:
+    # TOML secrets may be non-strings (e.g. DEMO_MODE = true).
+    if value is None:
+        return None
+    return str(value).strip() or None
 
 
 def require_api_key(key_name: str, message: str) -> str:
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-from graphviz import Digraph
 import streamlit as st
 
 
@@ -8,8 +7,7 @@ def render_bullets(items: list[str], empty_message: str = "No data available.")
     if not items:
         st.write(empty_message)
         return
-    for item in items:
-        st.markdown(f"- {item}")
+    st.markdown("\n".join(f"- {item}" for item in items))
 
 
 def render_diagram(mermaid_text: str, key_concepts: list[str]) -> None:
@@ -19,14 +17,21 @@ def render_diagram(mermaid_text: str, key_concepts: list[str]) -> None:
         st.code(cleaned, language="mermaid")
 
     st.markdown("Graphviz diagram")
+    concepts = key_concepts[:8] if key_concepts else ["No concepts generated"]
+    st.graphviz_chart(_build_concept_dot(tuple(concepts)))
+
+
+@st.cache_data(ttl=3600, max_entries=256, show_spinner=False)
+def _build_concept_dot(concepts: tuple[str, ...]) -> str:
+    from graphviz import Digraph
+
     dot = Digraph()
     dot.attr(rankdir="LR")
     dot.node("topic", "Core Topic")
 
-    concepts = key_concepts[:8] if key_concepts else ["No concepts generated"]
     for index, concept in enumerate(concepts):
         node = f"k{index}"
         dot.node(node, concept)
         dot.edge("topic", node)
 
-    st.graphviz_chart(dot)
\ No newline at end of file
+    return dot.source